@@ -0,0 +1,107 @@
+"""
+Convert the raw shot map CSV into the Parquet file read by streamlit_project.py.
+
+Run once (and again whenever the CSV changes):
+    python prepare_data.py
+"""
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+CSV_PATH = 'euros_2024_shot_map.csv'
+PARQUET_PATH = 'euros_2024_shot_map.parquet'
+
+# Raw CSV columns needed to build the shot table
+CSV_COLUMNS = [
+    'type', 'team', 'player', 'location', 'shot_statsbomb_xg', 'shot_outcome',
+    'shot_type', 'shot_technique', 'shot_body_part', 'minute'
+]
+CSV_DTYPES = {
+    # Keep location as text even when a chunk has no values, so .str always works
+    'location': 'string',
+    'team': 'category',
+    'player': 'category',
+    'shot_outcome': 'category',
+    'shot_type': 'category'
+}
+
+# Rows of raw CSV parsed at a time, bounding peak memory
+CHUNK_SIZE = 100_000
+
+# Text columns stored as strings in Parquet and cast to category on load
+CATEGORICAL_COLUMNS = ['team', 'player', 'shot_outcome', 'shot_type', 'shot_technique', 'shot_body_part']
+
+# Columns the app actually reads from the Parquet file
+COLUMNS = [
+    'team', 'player', 'minute', 'loc_x', 'loc_y', 'shot_statsbomb_xg',
+    'shot_outcome', 'shot_type', 'shot_technique', 'shot_body_part', 'is_goal'
+]
+
+
+def clean_shots(df: pd.DataFrame) -> pd.DataFrame:
+    # Filter only shots and reset index
+    df = df[df['type'] == 'Shot'].copy()
+    df = df.reset_index(drop=True)
+    if df.empty:
+        return df
+    
+    # Split the "[x, y]" location strings straight into two contiguous
+    # float32 columns and drop the original text column
+    coords = df['location'].str.strip('[] ').str.split(',', expand=True).reindex(columns=[0, 1])
+    coords = coords.apply(pd.to_numeric, errors='coerce').fillna(0.0)
+    df[['loc_x', 'loc_y']] = coords.astype('float32').to_numpy()
+    df = df.drop(columns=['location'])
+    
+    # Strip text columns once; categories are built on load, since each
+    # chunk would otherwise carry its own set
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('string').str.strip()
+    
+    # Downcast numeric columns; this dataset doesn't need 64-bit precision
+    df['shot_statsbomb_xg'] = df['shot_statsbomb_xg'].astype('float32')
+    df['minute'] = df['minute'].astype('Int16')
+    
+    # Flag goals once so aggregations can use plain sums
+    df['is_goal'] = df['shot_outcome'].eq('Goal').fillna(False).astype(bool)
+    return df
+
+
+def main():
+    # Write to a temp file next to the target and only move it into place once
+    # every chunk has been written, so a failure never leaves a truncated file
+    tmp_path = PARQUET_PATH + '.tmp'
+    writer = None
+    success = False
+    try:
+        # Stream the CSV in chunks, reading only the columns we need with the
+        # correct encoding, and append each cleaned chunk as a Parquet row group
+        with pd.read_csv(CSV_PATH, encoding='utf-8', usecols=CSV_COLUMNS,
+                         dtype=CSV_DTYPES, chunksize=CHUNK_SIZE) as reader:
+            for chunk in reader:
+                chunk = clean_shots(chunk)
+                if chunk.empty:
+                    continue
+                if writer is None:
+                    table = pa.Table.from_pandas(chunk[COLUMNS], preserve_index=False)
+                    writer = pq.ParquetWriter(tmp_path, table.schema, compression='zstd')
+                else:
+                    table = pa.Table.from_pandas(chunk[COLUMNS], schema=writer.schema, preserve_index=False)
+                writer.write_table(table)
+        success = writer is not None
+    finally:
+        if writer is not None:
+            writer.close()
+        if success:
+            os.replace(tmp_path, PARQUET_PATH)
+        elif os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    
+    if not success:
+        raise ValueError(f"No shots found in {CSV_PATH}; {PARQUET_PATH} was not updated")
+
+
+if __name__ == '__main__':
+    main()
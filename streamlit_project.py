@@ -3,13 +3,18 @@ Make sure you have the following installed:
 - streamlit
 - mplsoccer
 - pandas
+- pyarrow
+
+Run prepare_data.py first to build the Parquet file the app reads.
 """
-import json
+import numpy as np
 import pandas as pd
 import streamlit as st
 import matplotlib.pyplot as plt
 from mplsoccer import VerticalPitch
 
+from prepare_data import CATEGORICAL_COLUMNS, COLUMNS, PARQUET_PATH
+
 # Set page config
 st.set_page_config(page_title="Euros 2024 Shot Map", layout="wide")
 
@@ -17,123 +22,152 @@ st.set_page_config(page_title="Euros 2024 Shot Map", layout="wide")
 st.title("Euros 2024 Shot Map")
 st.subheader("Filter to any team/player to see all their shots taken!")
 
-try:
-    # Read and process the data with the correct encoding
-    df = pd.read_csv('euros_2024_shot_map.csv', encoding='utf-8')
+@st.cache_data
+def load_shots(path: str) -> pd.DataFrame:
+    # Shots are pre-cleaned by prepare_data.py, so only read the columns we use
+    df = pd.read_parquet(path, columns=COLUMNS)
+    for col in CATEGORICAL_COLUMNS:
+        df[col] = df[col].astype('category')
+    return df
+
+
+def aggregate_by_codes(codes, n_groups: int, xg, is_goal) -> pd.DataFrame:
+    # Single-pass sums/counts per group code, skipping missing keys and xG like groupby does
+    valid = codes >= 0
+    codes, xg, is_goal = codes[valid], xg[valid], is_goal[valid]
+    has_xg = ~np.isnan(xg)
+    
+    shots = np.bincount(codes, minlength=n_groups)
+    xg_count = np.bincount(codes, weights=has_xg, minlength=n_groups)
+    total_xg = np.bincount(codes, weights=np.where(has_xg, xg, 0.0), minlength=n_groups)
+    goals = np.bincount(codes, weights=is_goal, minlength=n_groups).astype(np.int64)
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        avg_xg = total_xg / xg_count
+    
+    stats = pd.DataFrame({
+        'Total xG': total_xg,
+        'Avg xG': avg_xg,
+        'Goals': goals,
+        'Shots': shots
+    }).round(3)
+    stats['Conversion Rate'] = (stats['Goals'] / stats['Shots'] * 100).round(1)
+    return stats
+
+
+@st.cache_data
+def compute_rankings(path: str):
+    # Key on the path so reruns don't hash the whole frame
+    df = load_shots(path)
     
-    # Clean column names (remove any whitespace)
-    df.columns = df.columns.str.strip()
+    xg = df['shot_statsbomb_xg'].to_numpy(np.float64)
+    is_goal = df['is_goal'].to_numpy(np.float64)
+    team_codes = df['team'].cat.codes.to_numpy(np.int64)
+    player_codes = df['player'].cat.codes.to_numpy(np.int64)
+    teams = df['team'].cat.categories
+    players = df['player'].cat.categories
     
-    # Filter only shots and reset index
-    df = df[df['type'] == 'Shot'].copy()
-    df = df.reset_index(drop=True)
+    # Calculate team statistics, one row per team category
+    team_stats = aggregate_by_codes(team_codes, len(teams), xg, is_goal)
+    team_stats.index = pd.Index(teams, name='team')
+    team_stats = team_stats[team_stats['Shots'] > 0]
     
-    # Convert location string to list
-    def parse_location(loc_str):
-        try:
-            if pd.isna(loc_str):
-                return [0, 0]
-            # Clean the string and convert to JSON
-            clean_str = str(loc_str).strip().replace("'", '"')
-            return json.loads(clean_str)
-        except:
-            return [0, 0]  # Default location if parsing fails
-            
-    df['location'] = df['location'].apply(parse_location)
+    # Calculate player statistics over combined (player, team) codes, compacted
+    # to the observed pairs so the work doesn't grow with players x teams
+    valid = (player_codes >= 0) & (team_codes >= 0)
+    pair_codes = player_codes[valid] * len(teams) + team_codes[valid]
+    uniq, inv = np.unique(pair_codes, return_inverse=True)
+    player_stats = aggregate_by_codes(inv, len(uniq), xg[valid], is_goal[valid])
+    player_stats.index = pd.MultiIndex.from_arrays(
+        [players[uniq // len(teams)], teams[uniq % len(teams)]],
+        names=['player', 'team']
+    )
+    return team_stats, player_stats
+
+
+@st.cache_data
+def team_player_index(path: str):
+    # Map each team to its sorted list of players
+    df = load_shots(path)
+    return {t: sorted(g['player'].unique().tolist()) for t, g in df.groupby('team', sort=False, observed=True)}
+
+
+@st.cache_resource
+def get_pitch():
+    # The pitch never changes, so build it once
+    return VerticalPitch(
+        pitch_type='statsbomb',
+        line_zorder=2,
+        pitch_color='#22312b',
+        line_color='white',
+        half=True
+    )
+
+
+try:
+    df = load_shots(PARQUET_PATH)
     
     def filter_data(df: pd.DataFrame, team: str, player: str):
-        filtered = df.copy()
+        mask = np.ones(len(df), dtype=bool)
         if team and team != 'All Teams':
-            filtered = filtered[filtered['team'] == team]
+            mask &= (df['team'].values == team)
         if player and player != 'All Players':
-            filtered = filtered[filtered['player'] == player]
-        return filtered
+            mask &= (df['player'].values == player)
+        return df.loc[mask]
 
     def plot_shots(df, ax, pitch):
-        scatter_points = []
-        annotations = []
+        x = df['loc_x'].to_numpy()
+        y = df['loc_y'].to_numpy()
+        xg = df['shot_statsbomb_xg'].fillna(0.05).to_numpy()
+        goal_mask = df['is_goal'].to_numpy()
         
-        for _, row in df.iterrows():
-            try:
-                x, y = row['location'][0], row['location'][1]
-                shot_xg = float(row.get('shot_statsbomb_xg', 0.05))
-                is_goal = str(row.get('shot_outcome')).strip() == 'Goal'
-                
-                # Create scatter point
-                point = pitch.scatter(
-                    x=float(x),
-                    y=float(y),
-                    ax=ax,
-                    s=1000 * shot_xg,  # Size based on xG
-                    color='green' if is_goal else 'red',
-                    edgecolors='black',
-                    alpha=0.7 if is_goal else 0.3,
-                    zorder=2 if is_goal else 1
-                )
-                
-                # Add annotation with shot details
-                shot_info = [
-                    f"Player: {row.get('player', 'Unknown')}",
-                    f"Team: {row.get('team', 'Unknown')}",
-                    f"Outcome: {row.get('shot_outcome', 'Unknown')}",
-                    f"xG: {shot_xg:.3f}",
-                    f"Type: {row.get('shot_type', 'Unknown')}"
-                ]
-                
-                # Add optional shot details if available
-                if 'shot_technique' in row and pd.notna(row['shot_technique']):
-                    shot_info.append(f"Technique: {row['shot_technique']}")
-                if 'shot_body_part' in row and pd.notna(row['shot_body_part']):
-                    shot_info.append(f"Body Part: {row['shot_body_part']}")
-                if 'minute' in row and pd.notna(row['minute']):
-                    shot_info.append(f"Minute: {row['minute']}")
-                
-                annotation = ax.annotate(
-                    '\n'.join(shot_info),
-                    xy=(x, y),
-                    xytext=(10, 10),
-                    textcoords="offset points",
-                    bbox=dict(boxstyle="round,pad=0.5", fc="white", ec="gray", alpha=0.8),
-                    visible=False
-                )
-                
-                scatter_points.append(point)
-                annotations.append(annotation)
-                
-            except Exception as e:
-                st.warning(f"Error plotting shot: {e}")
-                continue
-        
-        return scatter_points, annotations
+        # Plot goals and non-goals as two scatter layers, sized by xG
+        scatter_points = [
+            pitch.scatter(
+                x[goal_mask],
+                y[goal_mask],
+                ax=ax,
+                s=1000 * xg[goal_mask],
+                color='green',
+                edgecolors='black',
+                alpha=0.7,
+                zorder=2
+            ),
+            pitch.scatter(
+                x[~goal_mask],
+                y[~goal_mask],
+                ax=ax,
+                s=1000 * xg[~goal_mask],
+                color='red',
+                edgecolors='black',
+                alpha=0.3,
+                zorder=1
+            )
+        ]
+        return scatter_points
 
     # Create filters
     col1, col2 = st.columns(2)
     with col1:
-        team_options = ['All Teams'] + sorted(df['team'].unique().tolist())
+        team_options = ['All Teams'] + df['team'].cat.categories.tolist()
         team = st.selectbox("Select a team", options=team_options)
     
     with col2:
         if team and team != 'All Teams':
-            player_options = ['All Players'] + sorted(df[df['team'] == team]['player'].unique().tolist())
+            player_options = ['All Players'] + team_player_index(PARQUET_PATH)[team]
         else:
-            player_options = ['All Players'] + sorted(df['player'].unique().tolist())
+            player_options = ['All Players'] + df['player'].cat.categories.tolist()
         player = st.selectbox("Select a player", options=player_options)
 
     # Filter the data
     filtered_df = filter_data(df, team, player)
 
-    # Create and display the pitch
-    pitch = VerticalPitch(
-        pitch_type='statsbomb',
-        line_zorder=2,
-        pitch_color='#22312b',
-        line_color='white',
-        half=True
-    )
-
-    # Create the figure and plot
+    # Draw the pitch
+    pitch = get_pitch()
     fig, ax = pitch.draw(figsize=(10, 10))
-    scatter_points, annotations = plot_shots(filtered_df, ax, pitch)
+
+    # Plot the shots
+    scatter_points = plot_shots(filtered_df, ax, pitch)
     
     # Add a title to the plot
     title = f"Shot Map - {team}"
@@ -143,15 +177,18 @@ try:
 
     # Display the plot
     st.pyplot(fig)
+    plt.close(fig)
 
     # Display detailed statistics
     st.subheader("Shot Statistics")
     
     # Basic stats
+    total_shots = len(filtered_df)
+    goals = int(filtered_df['is_goal'].sum())
+    
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("Total Shots", len(filtered_df))
-        goals = len(filtered_df[filtered_df['shot_outcome'].str.strip() == 'Goal'])
+        st.metric("Total Shots", total_shots)
         st.metric("Goals", goals)
     
     with col2:
@@ -161,31 +198,13 @@ try:
         st.metric("Total xG", f"{total_xg:.3f}")
     
     with col3:
-        conversion_rate = (goals / len(filtered_df)) * 100 if len(filtered_df) > 0 else 0
+        conversion_rate = (goals / total_shots) * 100 if total_shots > 0 else 0
         st.metric("Conversion Rate", f"{conversion_rate:.1f}%")
 
     # Team and Player Rankings
     st.subheader("Team and Player Rankings")
     
-    # Calculate team statistics
-    team_stats = df.groupby('team').agg({
-        'shot_statsbomb_xg': ['sum', 'mean'],
-        'shot_outcome': lambda x: (x.str.strip() == 'Goal').sum(),
-        'type': 'count'
-    }).round(3)
-    
-    team_stats.columns = ['Total xG', 'Avg xG', 'Goals', 'Shots']
-    team_stats['Conversion Rate'] = (team_stats['Goals'] / team_stats['Shots'] * 100).round(1)
-    
-    # Calculate player statistics
-    player_stats = df.groupby(['player', 'team']).agg({
-        'shot_statsbomb_xg': ['sum', 'mean'],
-        'shot_outcome': lambda x: (x.str.strip() == 'Goal').sum(),
-        'type': 'count'
-    }).round(3)
-    
-    player_stats.columns = ['Total xG', 'Avg xG', 'Goals', 'Shots']
-    player_stats['Conversion Rate'] = (player_stats['Goals'] / player_stats['Shots'] * 100).round(1)
+    team_stats, player_stats = compute_rankings(PARQUET_PATH)
     
     # Display Team Rankings
     st.write("Team Rankings")
@@ -194,57 +213,57 @@ try:
     with col1:
         st.write("Top 5 Teams by Total xG")
         st.dataframe(
-            team_stats.sort_values('Total xG', ascending=False).head(),
+            team_stats.nlargest(5, 'Total xG'),
             hide_index=False
         )
         
         st.write("Top 5 Teams by Conversion Rate")
         st.dataframe(
-            team_stats.sort_values('Conversion Rate', ascending=False).head(),
+            team_stats.nlargest(5, 'Conversion Rate'),
             hide_index=False
         )
     
     with col2:
         st.write("Top 5 Teams by Goals")
         st.dataframe(
-            team_stats.sort_values('Goals', ascending=False).head(),
+            team_stats.nlargest(5, 'Goals'),
             hide_index=False
         )
         
         st.write("Top 5 Teams by Average xG")
         st.dataframe(
-            team_stats.sort_values('Avg xG', ascending=False).head(),
+            team_stats.nlargest(5, 'Avg xG'),
             hide_index=False
         )
     
     # Display Player Rankings
+    min_shots_players = player_stats[player_stats['Shots'] >= 3]
     st.write("Player Rankings")
     col1, col2 = st.columns(2)
     
     with col1:
         st.write("Top 5 Players by Total xG")
         st.dataframe(
-            player_stats.sort_values('Total xG', ascending=False).head(),
+            player_stats.nlargest(5, 'Total xG'),
             hide_index=False
         )
         
         st.write("Top 5 Players by Conversion Rate (min. 3 shots)")
-        min_shots_players = player_stats[player_stats['Shots'] >= 3]
         st.dataframe(
-            min_shots_players.sort_values('Conversion Rate', ascending=False).head(),
+            min_shots_players.nlargest(5, 'Conversion Rate'),
             hide_index=False
         )
     
     with col2:
         st.write("Top 5 Players by Goals")
         st.dataframe(
-            player_stats.sort_values('Goals', ascending=False).head(),
+            player_stats.nlargest(5, 'Goals'),
             hide_index=False
         )
         
         st.write("Top 5 Players by Average xG (min. 3 shots)")
         st.dataframe(
-            min_shots_players.sort_values('Avg xG', ascending=False).head(),
+            min_shots_players.nlargest(5, 'Avg xG'),
             hide_index=False
         )
 
@@ -254,6 +273,7 @@ try:
     # Shot outcomes
     st.write("Shot Outcomes")
     outcome_counts = filtered_df['shot_outcome'].value_counts()
+    outcome_counts = outcome_counts[outcome_counts > 0]
     st.bar_chart(outcome_counts)
     
     # Show detailed shot data
@@ -267,14 +287,10 @@ try:
         if col in df.columns:
             available_columns.append(col)
     
-    shot_details = filtered_df[available_columns].copy()
-    
-    # Clean up the data for display
-    for col in shot_details.columns:
-        if shot_details[col].dtype == 'object':
-            shot_details[col] = shot_details[col].str.strip()
-    
-    shot_details = shot_details.sort_values('minute')
+    # Text columns are already stripped at load, so project to the displayed
+    # columns first and sort that narrow frame (stable keeps event order within a minute)
+    shot_details = filtered_df.loc[:, available_columns]
+    shot_details = shot_details.sort_values('minute', kind='stable')
     
     st.dataframe(
         shot_details,